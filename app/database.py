@@ -3,12 +3,24 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///app.db")
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+# Server databases: size the pool for concurrent requests instead of the
+# default 5 + 10 overflow, and recycle connections before server-side timeouts.
+# Keep (DB_POOL_SIZE + DB_MAX_OVERFLOW) * workers under the server's max_connections.
+_pool_args = {} if IS_SQLITE else {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "20")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+}
 
 # For SQLite, need check_same_thread False for multithreading in FastAPI
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {},
+    connect_args={"check_same_thread": False} if IS_SQLITE else {},
     pool_pre_ping=True,
+    **_pool_args,
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
@@ -1,16 +1,32 @@
 # app/main.py
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import os
-import random
+import pathlib
+import secrets
 import sqlite3
-import string
+import time
+from base64 import b64decode, b64encode
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
 from datetime import datetime, date
-from typing import Dict, List, Tuple, Optional
+from functools import lru_cache
+from typing import AsyncIterator, Deque, Dict, Iterator, List, Tuple, Optional
 
+import aiosqlite
+import jinja2
 from fastapi import FastAPI, Request, Form, HTTPException
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import ORJSONResponse, Response
+from itsdangerous import BadSignature
+from jinja2.utils import htmlsafe_json_dumps
+from markupsafe import Markup
+from starlette.datastructures import MutableHeaders, QueryParams
+from starlette.middleware.gzip import GZipMiddleware
 from starlette.middleware.sessions import SessionMiddleware
+from starlette.requests import HTTPConnection
 from starlette.responses import RedirectResponse
 from starlette.staticfiles import StaticFiles
 from starlette.templating import Jinja2Templates
@@ -18,40 +34,148 @@ from starlette.templating import Jinja2Templates
 # -----------------------------------------------------------------------------
 # App & config
 # -----------------------------------------------------------------------------
-app = FastAPI()
+# JSON responses (probes, favorite toggle) are encoded with orjson.
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Secret for session cookies (replace with env var in prod)
 SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-change-me")
-app.add_middleware(SessionMiddleware, secret_key=SECRET_KEY, same_site="lax")
-
-# Static files
+SESSION_MAX_AGE = int(os.getenv("SESSION_MAX_AGE", str(14 * 24 * 60 * 60)))
+
+# Probe and asset requests never read the session; skip cookie decode/sign for them.
+_SESSIONLESS_PATHS = frozenset({"/health", "/ready"})
+# An unchanged session is only re-signed once its cookie is this old, which keeps
+# the sliding expiry without a Set-Cookie on every response.
+SESSION_REFRESH_AFTER = 24 * 60 * 60
+
+class _ProbeAwareSessionMiddleware(SessionMiddleware):
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await super().__call__(scope, receive, send)
+            return
+        path = scope["path"]
+        if (
+            path in _SESSIONLESS_PATHS
+            or path.startswith("/static/")
+            or (path == "/" and scope["method"] == "HEAD")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        # Same cookie format as SessionMiddleware, but remember what came in so an
+        # untouched session is not re-serialized, re-signed and re-sent.
+        initial: Optional[bytes] = None
+        signed_at = 0.0
+        cookie = HTTPConnection(scope).cookies.get(self.session_cookie)
+        scope["session"] = {}
+        if cookie:
+            try:
+                initial, ts = self.signer.unsign(cookie.encode("utf-8"), max_age=self.max_age, return_timestamp=True)
+                scope["session"] = json.loads(b64decode(initial))
+                signed_at = ts.timestamp()
+            except BadSignature:
+                initial = None
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                session = scope["session"]
+                if session:
+                    data = b64encode(json.dumps(session).encode("utf-8"))
+                    if data != initial or time.time() - signed_at >= SESSION_REFRESH_AFTER:
+                        value = self.signer.sign(data).decode("utf-8")
+                        max_age = f"Max-Age={self.max_age}; " if self.max_age else ""
+                        MutableHeaders(scope=message).append(
+                            "Set-Cookie",
+                            f"{self.session_cookie}={value}; path={self.path}; {max_age}{self.security_flags}",
+                        )
+                elif initial is not None:
+                    # The session has been cleared.
+                    MutableHeaders(scope=message).append(
+                        "Set-Cookie",
+                        f"{self.session_cookie}=null; path={self.path}; "
+                        f"expires=Thu, 01 Jan 1970 00:00:00 GMT; {self.security_flags}",
+                    )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+app.add_middleware(_ProbeAwareSessionMiddleware, secret_key=SECRET_KEY, same_site="lax", max_age=SESSION_MAX_AGE)
+# Images are already compressed; gzipping them again only burns CPU.
+_PRECOMPRESSED_EXTS = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".ico", ".woff", ".woff2")
+
+class _SelectiveGZipMiddleware(GZipMiddleware):
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].lower().endswith(_PRECOMPRESSED_EXTS):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+# Added last so it is outermost: compresses HTML pages, JSON and text assets.
+app.add_middleware(_SelectiveGZipMiddleware, minimum_size=500, compresslevel=6)
+
+# Static files. Templates link assets with a ?v=<content hash> query (see
+# static_version), so those URLs change whenever the file does and browsers may
+# keep them for a year. Unversioned requests revalidate via ETag/Last-Modified.
 STATIC_DIR = os.path.join(os.path.dirname(__file__), "static")
-if os.path.isdir(STATIC_DIR):
-    app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
-# Templates
-templates = Jinja2Templates(directory=os.path.join(os.path.dirname(__file__), "templates"))
+class _CachingStaticFiles(StaticFiles):
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if "v" in QueryParams(scope.get("query_string", b"")):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        else:
+            response.headers["Cache-Control"] = "no-cache"
+        return response
+
+def _static_version(path: str) -> str:
+    try:
+        with open(os.path.join(STATIC_DIR, path), "rb") as f:
+            return hashlib.md5(f.read(), usedforsecurity=False).hexdigest()[:10]
+    except OSError:
+        return "0"
+
+if os.getenv("ENV") != "dev":
+    _static_version = lru_cache(maxsize=None)(_static_version)
+
+if os.path.isdir(STATIC_DIR):
+    app.mount("/static", _CachingStaticFiles(directory=STATIC_DIR), name="static")
+
+# Templates: compiled bytecode is cached on disk so fresh workers skip parsing,
+# and per-render mtime checks are only done while editing (ENV=dev). The set of
+# templates is small and fixed, so the compiled-template cache is a plain
+# unbounded dict rather than a locking LRU.
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
+templates = Jinja2Templates(
+    env=jinja2.Environment(
+        loader=jinja2.FileSystemLoader(TEMPLATES_DIR),
+        autoescape=True,
+        auto_reload=os.getenv("ENV") == "dev",
+        bytecode_cache=jinja2.FileSystemBytecodeCache(),
+        cache_size=-1,
+    )
+)
 
 # -----------------------------------------------------------------------------
 # Jinja filters
 # -----------------------------------------------------------------------------
+@lru_cache(maxsize=4096)
 def _datetimeformat(value, fmt="%Y-%m-%d"):
-    """Format a datetime/date/ISO string for display."""
+    """Format a datetime/date/ISO string for display (memoized; inputs repeat across rows and requests)."""
     if value is None or value == "":
         return ""
     if isinstance(value, (datetime, date)):
-        dt = value
-    else:
-        dt = None
-        for try_fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%m/%d/%Y", "%Y-%m-%dT%H:%M:%S"):
-            try:
-                dt = datetime.strptime(str(value), try_fmt)
-                break
-            except Exception:
-                pass
-        if dt is None:
-            return str(value)
-    return dt.strftime(fmt)
+        return value.strftime(fmt)
+    value = str(value)
+    try:
+        # SQLite's datetime('now') / date strings are ISO; parse them in C.
+        return datetime.fromisoformat(value).strftime(fmt)
+    except ValueError:
+        pass
+    for try_fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%m/%d/%Y", "%Y-%m-%dT%H:%M:%S"):
+        try:
+            return datetime.strptime(value, try_fmt).strftime(fmt)
+        except ValueError:
+            pass
+    return value
 
 def _initials(value: str, max_letters: int = 2) -> str:
     """'John Q Public' -> 'JQ'."""
@@ -62,186 +186,425 @@ def _initials(value: str, max_letters: int = 2) -> str:
     letters = "".join(p[0] for p in parts[:max_letters])
     return letters.upper()
 
+def _chart_json(labels: List[str], exitv: List[float]) -> Markup:
+    """Serialize the chart series once per render; safe to inline in <script>."""
+    return htmlsafe_json_dumps({"labels": labels, "exitv": exitv}, separators=(",", ":"))
+
 templates.env.filters["datetimeformat"] = _datetimeformat
 templates.env.filters["initials"] = _initials
+templates.env.globals["static_version"] = _static_version
 
 # -----------------------------------------------------------------------------
 # DB helpers / schema
 # -----------------------------------------------------------------------------
 DB_PATH = os.path.join(os.path.dirname(__file__), "app.db")
 
-def get_db() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES)
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", str(os.cpu_count() or 4)))
+
+# Applied once when a connection is opened; pooled connections keep them for life.
+_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA cache_size = -20000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA foreign_keys = ON",
+)
+# Database-level settings; only the writer may change them.
+_WRITER_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA wal_autocheckpoint = 1000",
+)
+
+def _new_pool(size: int) -> "asyncio.LifoQueue[Optional[aiosqlite.Connection]]":
+    # Pre-filled with empty slots; a connection is opened the first time a slot is taken.
+    pool: "asyncio.LifoQueue[Optional[aiosqlite.Connection]]" = asyncio.LifoQueue(maxsize=size)
+    for _ in range(size):
+        pool.put_nowait(None)
+    return pool
+
+# One writer serializes all writes; N readers run concurrently against the WAL.
+_write_pool = _new_pool(1)
+_read_pool = _new_pool(max(1, DB_READ_POOL_SIZE))
+
+# Pooled connections live for the whole process, so their prepared-statement
+# cache stays warm across requests; give it room for every query in this module.
+DB_CACHED_STATEMENTS = 256
+
+async def _connect(readonly: bool = False) -> aiosqlite.Connection:
+    opts = {"detect_types": sqlite3.PARSE_DECLTYPES, "cached_statements": DB_CACHED_STATEMENTS}
+    if readonly:
+        uri = f"{pathlib.Path(DB_PATH).absolute().as_uri()}?mode=ro"
+        conn = await aiosqlite.connect(uri, uri=True, **opts)
+    else:
+        conn = await aiosqlite.connect(DB_PATH, isolation_level=None, **opts)
+        for pragma in _WRITER_PRAGMAS:
+            await conn.execute(pragma)
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
+    for pragma in _PRAGMAS:
+        await conn.execute(pragma)
     return conn
 
+@asynccontextmanager
+async def _checkout(pool, readonly: bool) -> AsyncIterator[aiosqlite.Connection]:
+    conn = await pool.get()
+    try:
+        if conn is None:
+            conn = await _connect(readonly)
+        yield conn
+    finally:
+        if conn is not None and conn.in_transaction:
+            await conn.rollback()
+        pool.put_nowait(conn)
+
+@asynccontextmanager
+async def get_db_read() -> AsyncIterator[aiosqlite.Connection]:
+    """Borrow a read-only connection; waits while all readers are in use."""
+    async with _checkout(_read_pool, readonly=True) as conn:
+        yield conn
+
+@asynccontextmanager
+async def get_db_write() -> AsyncIterator[aiosqlite.Connection]:
+    """Borrow the single writer connection inside BEGIN IMMEDIATE; commits on success."""
+    async with _checkout(_write_pool, readonly=False) as conn:
+        await conn.execute("BEGIN IMMEDIATE")
+        yield conn
+        await conn.commit()
+
+@asynccontextmanager
+async def _fk_write(detail: str = "Player not found") -> AsyncIterator[aiosqlite.Connection]:
+    """Writer for inserts that reference other rows; a foreign-key miss becomes a 404."""
+    try:
+        async with get_db_write() as conn:
+            yield conn
+    except sqlite3.IntegrityError:
+        raise HTTPException(status_code=404, detail=detail)
+
+async def _close_pools():
+    for pool in (_write_pool, _read_pool):
+        for _ in range(pool.qsize()):
+            conn = pool.get_nowait()
+            if conn is not None:
+                await conn.close()
+            pool.put_nowait(None)
+
+async def _fetchval(conn: aiosqlite.Connection, sql: str, params=()):
+    # First column of the first row, or None; read as a plain tuple (skips sqlite3.Row).
+    async with conn.execute(sql, params) as cur:
+        cur.row_factory = None
+        row = await cur.fetchone()
+    return row[0] if row else None
+
+async def _fetchall_tuples(conn: aiosqlite.Connection, sql: str, params=()) -> List[tuple]:
+    # Plain tuples for hot loops that unpack columns positionally (skips sqlite3.Row).
+    async with conn.execute(sql, params) as cur:
+        cur.row_factory = None
+        return await cur.fetchall()
+
+async def _read(sql: str, params=(), tuples: bool = False) -> list:
+    """Run one query on its own reader, so independent reads can be gathered."""
+    async with get_db_read() as conn:
+        if tuples:
+            return await _fetchall_tuples(conn, sql, params)
+        return await conn.execute_fetchall(sql, params)
+
 def _has_column(conn: sqlite3.Connection, table: str, column: str) -> bool:
     cur = conn.execute(f"PRAGMA table_info({table})")
     return any(row["name"] == column for row in cur.fetchall())
 
-def ensure_schema():
-    """Create tables and add any missing columns referenced by templates/routes."""
-    conn = get_db()
+@contextmanager
+def _schema_connection() -> Iterator[sqlite3.Connection]:
+    # Plain synchronous connection for startup; the async pools are opened lazily afterwards.
+    conn = sqlite3.connect(DB_PATH, isolation_level=None)
+    conn.row_factory = sqlite3.Row
     try:
-        # players
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS players (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                login_code TEXT UNIQUE,
-                image_path TEXT,
-                created_at TEXT DEFAULT (datetime('now')),
-                updated_at TEXT DEFAULT (datetime('now'))
-            );
-        """)
-
-        # notes
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS notes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                player_id INTEGER NOT NULL,
-                instructor_id INTEGER,
-                text TEXT NOT NULL,
-                shared INTEGER DEFAULT 0,
-                kind TEXT DEFAULT 'coach',
-                created_at TEXT DEFAULT (datetime('now')),
-                updated_at TEXT DEFAULT (datetime('now')),
-                FOREIGN KEY(player_id) REFERENCES players(id) ON DELETE CASCADE
-            );
-        """)
-        if not _has_column(conn, "notes", "kind"):
-            conn.execute("ALTER TABLE notes ADD COLUMN kind TEXT DEFAULT 'coach'")
-
-        # drills
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS drills (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT,
-                created_at TEXT DEFAULT (datetime('now')),
-                updated_at TEXT DEFAULT (datetime('now'))
-            );
-        """)
-
-        # drill_assignments (canonical)
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS drill_assignments (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                player_id INTEGER NOT NULL,
-                instructor_id INTEGER,
-                drill_id INTEGER NOT NULL,
-                note TEXT,
-                status TEXT DEFAULT 'assigned',
-                due_date TEXT,
-                created_at TEXT DEFAULT (datetime('now')),
-                updated_at TEXT DEFAULT (datetime('now')),
-                FOREIGN KEY(player_id) REFERENCES players(id) ON DELETE CASCADE,
-                FOREIGN KEY(drill_id) REFERENCES drills(id) ON DELETE CASCADE
-            );
-        """)
-        if not _has_column(conn, "drill_assignments", "due_date"):
-            conn.execute("ALTER TABLE drill_assignments ADD COLUMN due_date TEXT")
-
-        # metrics
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS metrics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                player_id INTEGER NOT NULL,
-                recorded_at TEXT,
-                date TEXT,
-                metric TEXT,
-                value REAL,
-                unit TEXT,
-                source TEXT,
-                entered_by_instructor_id INTEGER,
-                note TEXT,
-                exit_velocity REAL,
-                launch_angle REAL,
-                spin_rate REAL,
-                created_at TEXT DEFAULT (datetime('now')),
-                updated_at TEXT DEFAULT (datetime('now')),
-                FOREIGN KEY(player_id) REFERENCES players(id) ON DELETE CASCADE
-            );
-        """)
-        for col, ddl in [
-            ("metric", "ALTER TABLE metrics ADD COLUMN metric TEXT"),
-            ("value", "ALTER TABLE metrics ADD COLUMN value REAL"),
-            ("unit", "ALTER TABLE metrics ADD COLUMN unit TEXT"),
-            ("source", "ALTER TABLE metrics ADD COLUMN source TEXT"),
-            ("entered_by_instructor_id", "ALTER TABLE metrics ADD COLUMN entered_by_instructor_id INTEGER"),
-            ("note", "ALTER TABLE metrics ADD COLUMN note TEXT"),
-            ("recorded_at", "ALTER TABLE metrics ADD COLUMN recorded_at TEXT"),
-            ("date", "ALTER TABLE metrics ADD COLUMN date TEXT"),
-            ("exit_velocity", "ALTER TABLE metrics ADD COLUMN exit_velocity REAL"),
-            ("launch_angle", "ALTER TABLE metrics ADD COLUMN launch_angle REAL"),
-            ("spin_rate", "ALTER TABLE metrics ADD COLUMN spin_rate REAL"),
-        ]:
-            if not _has_column(conn, "metrics", col):
-                conn.execute(ddl)
-
-        # favorites (per-instructor)
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS instructor_favorites (
-                instructor_id INTEGER NOT NULL,
-                player_id INTEGER NOT NULL,
-                created_at TEXT DEFAULT (datetime('now')),
-                PRIMARY KEY (instructor_id, player_id),
-                FOREIGN KEY(player_id) REFERENCES players(id) ON DELETE CASCADE
-            );
-        """)
-
-        # seed drills if empty
-        existing = conn.execute("SELECT COUNT(*) AS c FROM drills").fetchone()["c"]
-        if existing == 0:
-            conn.executemany(
-                "INSERT INTO drills (title, description) VALUES (?, ?)",
-                [
-                    ("Top-hand tee", "Focus on top-hand path and contact"),
-                    ("Opposite-field T", "Drive to oppo gap, stay inside"),
-                    ("Medicine-ball throws", "Explosive hip rotation"),
-                ],
-            )
-
+        for pragma in _WRITER_PRAGMAS + _PRAGMAS:
+            conn.execute(pragma)
+        conn.execute("BEGIN IMMEDIATE")
+        yield conn
         conn.commit()
     finally:
+        if conn.in_transaction:
+            conn.rollback()
         conn.close()
 
+# Stored in the database's user_version; bump it whenever _apply_schema() changes
+# so existing databases pick the change up on the next start.
+SCHEMA_VERSION = 1
+
+def ensure_schema():
+    """Bring the database up to SCHEMA_VERSION, then refresh planner statistics."""
+    with _schema_connection() as conn:
+        # Workers take the write lock in turn, so only the first one migrates.
+        if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            _apply_schema(conn)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+        # Refresh planner statistics on every boot, but sample at most ~400 rows
+        # per index so the cost stays flat as tables grow.
+        conn.execute("PRAGMA analysis_limit = 400")
+        conn.execute("ANALYZE")
+
+def _apply_schema(conn: sqlite3.Connection):
+    """Create tables and add any missing columns referenced by templates/routes."""
+    # players
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS players (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            login_code TEXT UNIQUE,
+            image_path TEXT,
+            created_at TEXT DEFAULT (datetime('now')),
+            updated_at TEXT DEFAULT (datetime('now'))
+        );
+    """)
+
+    # notes
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS notes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            player_id INTEGER NOT NULL,
+            instructor_id INTEGER,
+            text TEXT NOT NULL,
+            shared INTEGER DEFAULT 0,
+            kind TEXT DEFAULT 'coach',
+            created_at TEXT DEFAULT (datetime('now')),
+            updated_at TEXT DEFAULT (datetime('now')),
+            FOREIGN KEY(player_id) REFERENCES players(id) ON DELETE CASCADE
+        );
+    """)
+    if not _has_column(conn, "notes", "kind"):
+        conn.execute("ALTER TABLE notes ADD COLUMN kind TEXT DEFAULT 'coach'")
+
+    # drills
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS drills (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            created_at TEXT DEFAULT (datetime('now')),
+            updated_at TEXT DEFAULT (datetime('now'))
+        );
+    """)
+
+    # drill_assignments (canonical)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS drill_assignments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            player_id INTEGER NOT NULL,
+            instructor_id INTEGER,
+            drill_id INTEGER NOT NULL,
+            note TEXT,
+            status TEXT DEFAULT 'assigned',
+            due_date TEXT,
+            created_at TEXT DEFAULT (datetime('now')),
+            updated_at TEXT DEFAULT (datetime('now')),
+            FOREIGN KEY(player_id) REFERENCES players(id) ON DELETE CASCADE,
+            FOREIGN KEY(drill_id) REFERENCES drills(id) ON DELETE CASCADE
+        );
+    """)
+    if not _has_column(conn, "drill_assignments", "due_date"):
+        conn.execute("ALTER TABLE drill_assignments ADD COLUMN due_date TEXT")
+
+    # metrics
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS metrics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            player_id INTEGER NOT NULL,
+            recorded_at TEXT,
+            date TEXT,
+            metric TEXT,
+            value REAL,
+            unit TEXT,
+            source TEXT,
+            entered_by_instructor_id INTEGER,
+            note TEXT,
+            exit_velocity REAL,
+            launch_angle REAL,
+            spin_rate REAL,
+            created_at TEXT DEFAULT (datetime('now')),
+            updated_at TEXT DEFAULT (datetime('now')),
+            FOREIGN KEY(player_id) REFERENCES players(id) ON DELETE CASCADE
+        );
+    """)
+    for col, ddl in [
+        ("metric", "ALTER TABLE metrics ADD COLUMN metric TEXT"),
+        ("value", "ALTER TABLE metrics ADD COLUMN value REAL"),
+        ("unit", "ALTER TABLE metrics ADD COLUMN unit TEXT"),
+        ("source", "ALTER TABLE metrics ADD COLUMN source TEXT"),
+        ("entered_by_instructor_id", "ALTER TABLE metrics ADD COLUMN entered_by_instructor_id INTEGER"),
+        ("note", "ALTER TABLE metrics ADD COLUMN note TEXT"),
+        ("recorded_at", "ALTER TABLE metrics ADD COLUMN recorded_at TEXT"),
+        ("date", "ALTER TABLE metrics ADD COLUMN date TEXT"),
+        ("exit_velocity", "ALTER TABLE metrics ADD COLUMN exit_velocity REAL"),
+        ("launch_angle", "ALTER TABLE metrics ADD COLUMN launch_angle REAL"),
+        ("spin_rate", "ALTER TABLE metrics ADD COLUMN spin_rate REAL"),
+    ]:
+        if not _has_column(conn, "metrics", col):
+            conn.execute(ddl)
+
+    # favorites (per-instructor)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS instructor_favorites (
+            instructor_id INTEGER NOT NULL,
+            player_id INTEGER NOT NULL,
+            created_at TEXT DEFAULT (datetime('now')),
+            PRIMARY KEY (instructor_id, player_id),
+            FOREIGN KEY(player_id) REFERENCES players(id) ON DELETE CASCADE
+        );
+    """)
+
+    # indexes for the per-player reads (dashboard, player detail)
+    # v_metrics_daily groups each player's rows by day; indexing that exact day
+    # expression lets the GROUP BY walk the index instead of sorting every row.
+    conn.execute("DROP INDEX IF EXISTS idx_metrics_player_recorded")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_metrics_player_day"
+        " ON metrics(player_id, substr(COALESCE(date, recorded_at, created_at), 1, 10))"
+    )
+    # (id DESC breaks created_at ties, so ORDER BY created_at DESC, id DESC needs no sort step)
+    conn.execute("DROP INDEX IF EXISTS idx_notes_player_created")
+    conn.execute("DROP INDEX IF EXISTS idx_da_player_created")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_notes_player_created_id ON notes(player_id, created_at DESC, id DESC)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_da_player_created_id ON drill_assignments(player_id, created_at DESC, id DESC)")
+    # the player dashboard only lists shared notes; seek straight to them
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_notes_player_shared
+        ON notes(player_id, created_at DESC, id DESC)
+        WHERE shared = 1
+    """)
+    # latest generic metric entries per player, already in display order (no sort step)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_metrics_player_latest
+        ON metrics(player_id, COALESCE(recorded_at, date, created_at) DESC, id DESC)
+        WHERE metric IS NOT NULL
+    """)
+
+    # per-day pivot of metrics for the charts. Wide EV/LA/SR columns (old form)
+    # and generic metric/value rows (new form) feed the same daily columns.
+    # Recreated on every migration so definition changes take effect. The day
+    # expression must match idx_metrics_player_day.
+    conn.execute("DROP VIEW IF EXISTS v_metrics_daily")
+    conn.execute("""
+        CREATE VIEW v_metrics_daily AS
+        SELECT player_id,
+               substr(COALESCE(date, recorded_at, created_at), 1, 10) AS date,
+               MAX(COALESCE(exit_velocity,
+                            CASE WHEN metric IN ('ev', 'exit_velocity', 'exit-velocity') THEN value END)) AS exit_velocity,
+               MAX(COALESCE(launch_angle,
+                            CASE WHEN metric IN ('la', 'launch_angle', 'launch-angle') THEN value END)) AS launch_angle,
+               MAX(COALESCE(spin_rate,
+                            CASE WHEN metric IN ('sr', 'spin_rate', 'spin-rate') THEN value END)) AS spin_rate
+        FROM metrics
+        GROUP BY player_id, 2;
+    """)
+
+    # seed drills (fixed ids, so re-running is a no-op)
+    conn.executemany(
+        "INSERT OR IGNORE INTO drills (id, title, description) VALUES (?, ?, ?)",
+        [
+            (1, "Top-hand tee", "Focus on top-hand path and contact"),
+            (2, "Opposite-field T", "Drive to oppo gap, stay inside"),
+            (3, "Medicine-ball throws", "Explosive hip rotation"),
+        ],
+    )
+
+def _warm_templates():
+    # Compile every page now so the first request to each one doesn't pay for it.
+    for name in templates.env.list_templates(extensions=["html"]):
+        templates.env.get_template(name)
+
 @app.on_event("startup")
 def _on_startup():
     ensure_schema()
+    _warm_templates()
+
+@app.on_event("shutdown")
+async def _on_shutdown():
+    await _close_pools()
 
 # -----------------------------------------------------------------------------
 # Health / Ready / HEAD (for probes)
 # -----------------------------------------------------------------------------
 @app.get("/health", include_in_schema=False)
-def health():
+async def health():
     return {"ok": True}
 
 @app.get("/ready", include_in_schema=False)
-def ready():
+async def ready():
     try:
-        conn = get_db()
-        conn.execute("SELECT 1")
-        conn.close()
+        async with get_db_read() as conn:
+            await conn.execute("SELECT 1")
         return {"ready": True}
     except Exception as e:
         raise HTTPException(status_code=503, detail=f"not ready: {e}")
 
 @app.head("/", include_in_schema=False)
-def root_head():
+async def root_head():
     return Response(status_code=200)
 
 # -----------------------------------------------------------------------------
 # Session helpers
 # -----------------------------------------------------------------------------
-def _make_login_code(conn: sqlite3.Connection, length: int = 6) -> str:
-    for _ in range(64):
-        code = "".join(random.choices(string.digits, k=length))
-        row = conn.execute("SELECT 1 FROM players WHERE login_code = ?", (code,)).fetchone()
-        if not row:
-            return code
-    raise RuntimeError("Could not generate unique login code")
+# Collisions are detected by the UNIQUE index on players.login_code at INSERT
+# time, so only a handful of retries are ever needed.
+LOGIN_CODE_ATTEMPTS = 5
+LOGIN_CODE_LENGTH = 6
+
+def _make_login_code(length: int = LOGIN_CODE_LENGTH) -> str:
+    # One CSPRNG draw, zero-padded: codes stay unpredictable and cost no per-digit loop.
+    return f"{secrets.randbelow(10 ** length):0{length}d}"
+
+# Stored codes may also be imported, legacy P-XXXXXX or hashed values, so only
+# input that could not fit the column (models.Player.login_code) is turned away.
+LOGIN_CODE_MAX_LEN = 128
+
+def _could_be_login_code(code: str) -> bool:
+    return 0 < len(code) <= LOGIN_CODE_MAX_LEN
+
+# Brute-force guard for player login: a sliding window of failed attempts per
+# client, plus a short memory of codes that matched nobody so repeats skip the
+# query. Both tables are LRU-bounded, so junk keys evict the oldest entries.
+LOGIN_RATE_LIMIT = int(os.getenv("LOGIN_RATE_LIMIT", "10"))  # failures per window
+LOGIN_RATE_WINDOW = 60.0
+LOGIN_MISS_TTL = 10.0
+_LOGIN_TRACK_MAX = 10_000
+_login_failures: "OrderedDict[str, Deque[float]]" = OrderedDict()
+_login_misses: "OrderedDict[str, float]" = OrderedDict()
+
+# Only behind a proxy that appends to X-Forwarded-For (Render) is the header
+# trustworthy; run directly, any client could rotate it.
+TRUST_PROXY_HEADERS = os.getenv("TRUST_PROXY_HEADERS") == "1"
+
+def _login_client(request: Request) -> str:
+    if TRUST_PROXY_HEADERS:
+        # The proxy appends the connecting address as the right-most entry;
+        # everything left of it is client-supplied.
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.rsplit(",", 1)[-1].strip()
+    return request.client.host if request.client else ""
+
+def _login_blocked(client: str) -> bool:
+    hits = _login_failures.get(client)
+    if not hits:
+        return False
+    cutoff = time.monotonic() - LOGIN_RATE_WINDOW
+    while hits and hits[0] <= cutoff:
+        hits.popleft()
+    return len(hits) >= LOGIN_RATE_LIMIT
+
+def _record_login_failure(client: str, code: str):
+    now = time.monotonic()
+    hits = _login_failures.pop(client, None) or deque(maxlen=max(1, LOGIN_RATE_LIMIT))
+    hits.append(now)
+    _login_failures[client] = hits  # re-inserted as most recent
+    if len(_login_failures) > _LOGIN_TRACK_MAX:
+        _login_failures.popitem(last=False)
+
+    _login_misses[code] = now + LOGIN_MISS_TTL
+    _login_misses.move_to_end(code)
+    if len(_login_misses) > _LOGIN_TRACK_MAX:
+        _login_misses.popitem(last=False)
 
 def _require_instructor(request: Request) -> int:
     iid = request.session.get("instructor_id")
@@ -259,32 +622,37 @@ def _require_player(request: Request) -> int:
 # Index & auth
 # -----------------------------------------------------------------------------
 @app.get("/")
-def index(request: Request):
+async def index(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
 @app.post("/login/instructor")
-def login_instructor(request: Request):
+async def login_instructor(request: Request):
     """Simple demo login: set instructor_id=1 in session."""
     request.session["instructor_id"] = 1
     return RedirectResponse("/instructor", status_code=303)
 
 @app.post("/login/player")
-def login_player(request: Request, code: str = Form(...)):
+async def login_player(request: Request, code: str = Form(...)):
+    client = _login_client(request)
+    if _login_blocked(client):
+        return Response("Too many login attempts; try again in a minute.", status_code=429)
+
     code = (code or "").strip()
-    if not code:
+    if not _could_be_login_code(code):
         return RedirectResponse("/", status_code=303)
-    conn = get_db()
-    try:
-        row = conn.execute("SELECT id FROM players WHERE login_code = ?", (code,)).fetchone()
-        if not row:
-            return RedirectResponse("/", status_code=303)
-        request.session["player_id"] = row["id"]
-    finally:
-        conn.close()
+    if _login_misses.get(code, 0.0) > time.monotonic():
+        _record_login_failure(client, code)
+        return RedirectResponse("/", status_code=303)
+    async with get_db_read() as conn:
+        player_id = await _fetchval(conn, "SELECT id FROM players WHERE login_code = ?", (code,))
+    if player_id is None:
+        _record_login_failure(client, code)
+        return RedirectResponse("/", status_code=303)
+    request.session["player_id"] = player_id
     return RedirectResponse("/dashboard", status_code=303)
 
 @app.get("/logout")
-def logout(request: Request):
+async def logout(request: Request):
     request.session.clear()
     return RedirectResponse("/", status_code=303)
 
@@ -292,7 +660,7 @@ def logout(request: Request):
 # Drill library & assignment
 # -----------------------------------------------------------------------------
 @app.get("/drills")
-def drill_library(request: Request, player_id: Optional[int] = None, q: Optional[str] = None):
+async def drill_library(request: Request, player_id: Optional[int] = None, q: Optional[str] = None):
     # Instructor-only drill library. If player_id is provided, show "Assign" buttons in template.
     try:
         _require_instructor(request)
@@ -300,20 +668,17 @@ def drill_library(request: Request, player_id: Optional[int] = None, q: Optional
         return RedirectResponse("/", status_code=303)
 
     pattern = f"%{q}%" if q else "%"
-    conn = get_db()
-    try:
-        drills = conn.execute(
+    async with get_db_read() as conn:
+        drills = await conn.execute_fetchall(
             "SELECT id, title, COALESCE(description, '') AS description FROM drills WHERE title LIKE ? ORDER BY title",
             (pattern,),
-        ).fetchall()
+        )
 
         ctx = {"request": request, "drills": drills, "player_id": player_id, "q": q or ""}
         return templates.TemplateResponse("drill_library.html", ctx)
-    finally:
-        conn.close()
 
 @app.post("/drills/assign")
-def assign_drill(
+async def assign_drill(
     request: Request,
     player_id: int = Form(...),
     drill_id: int = Form(...),
@@ -324,52 +689,78 @@ def assign_drill(
     except HTTPException:
         return RedirectResponse("/", status_code=303)
 
-    conn = get_db()
-    try:
-        conn.execute(
+    async with _fk_write("Player or drill not found") as conn:
+        await conn.execute(
             """
             INSERT INTO drill_assignments (player_id, instructor_id, drill_id, note, status, created_at, updated_at)
             VALUES (?, ?, ?, ?, 'assigned', datetime('now'), datetime('now'))
             """,
             (player_id, iid, drill_id, (note or "").strip() or None),
         )
-        conn.commit()
-    finally:
-        conn.close()
+    _invalidate_dashboard(player_id)
 
     return RedirectResponse(f"/instructor/player/{player_id}", status_code=303)
 
 # -----------------------------------------------------------------------------
 # Instructor dashboard & actions
 # -----------------------------------------------------------------------------
+# Short-lived per-instructor cache of the roster page. Writes that change the
+# roster bump _roster_version so the next read rebuilds immediately.
+ROSTER_CACHE_TTL = 5.0
+_roster_version = 0
+_roster_cache: Dict[Tuple[int, str], Tuple[float, int, list, dict]] = {}
+
+def _invalidate_roster():
+    global _roster_version
+    _roster_version += 1
+
 @app.get("/instructor")
-def instructor_home(request: Request):
+async def instructor_home(request: Request):
     # must be logged in as instructor
     try:
         _require_instructor(request)
     except HTTPException:
         return RedirectResponse("/", status_code=303)
 
-    conn = get_db()
-    try:
-        instructor_id = request.session.get("instructor_id")
-        view = request.query_params.get("filter", "all")  # "all" | "favorites"
+    instructor_id = request.session.get("instructor_id")
+    # Only two views exist; anything else is "all" (and must not mint new cache keys).
+    view = "favorites" if request.query_params.get("filter") == "favorites" else "all"
 
-        # Pull all players and annotate favorite status using the correct table
-        all_players = conn.execute(
+    key = (instructor_id, view)
+    hit = _roster_cache.get(key)
+    if hit and hit[1] == _roster_version and hit[0] > time.monotonic():
+        players, grouped = hit[2], hit[3]
+    else:
+        version = _roster_version  # a write landing mid-load leaves this entry stale
+        players, grouped = await _load_roster(instructor_id, view)
+        now = time.monotonic()
+        for stale in [k for k, entry in _roster_cache.items() if entry[0] <= now]:
+            del _roster_cache[stale]
+        _roster_cache[key] = (now + ROSTER_CACHE_TTL, version, players, grouped)
+
+    ctx = {
+        "request": request,
+        "players": players,   # some templates may use this
+        "grouped": grouped,   # instructor_dashboard.html expects this
+        "filter": view,
+    }
+    return templates.TemplateResponse("instructor_dashboard.html", ctx)
+
+async def _load_roster(instructor_id: int, view: str) -> Tuple[list, dict]:
+    async with get_db_read() as conn:
+        # One query returns everything the roster cards render, favorite flag included
+        all_players = await conn.execute_fetchall(
             """
-            SELECT p.*,
-                   EXISTS (
-                       SELECT 1
-                       FROM instructor_favorites f
-                       WHERE f.player_id = p.id
-                         AND f.instructor_id = ?
-                   ) AS is_favorite
+            SELECT p.id, p.name, p.login_code, p.image_path,
+                   f.player_id IS NOT NULL AS is_favorite
             FROM players p
-            ORDER BY p.name
+            LEFT JOIN instructor_favorites f
+                   ON f.player_id = p.id
+                  AND f.instructor_id = ?
+            ORDER BY p.name COLLATE NOCASE, p.id
             """,
             (instructor_id,),
-        ).fetchall()
+        )
 
         # Slice out favorites for “My Clients”
         fav_players = [r for r in all_players if r["is_favorite"]]
@@ -385,24 +776,16 @@ def instructor_home(request: Request):
             grouped["All Players"] = all_players
             players = all_players
 
-        ctx = {
-            "request": request,
-            "players": players,   # some templates may use this
-            "grouped": grouped,   # instructor_dashboard.html expects this
-            "filter": view,
-        }
-        return templates.TemplateResponse("instructor_dashboard.html", ctx)
-    finally:
-        conn.close()
+        return players, grouped
 
 
 # Convenience route so "My Clients" can point here directly
 @app.get("/instructor/clients")
-def instructor_clients_redirect():
+async def instructor_clients_redirect():
     return RedirectResponse("/instructor?filter=favorites", status_code=303)
 
 @app.post("/players/create")
-def create_player(request: Request, name: str = Form(...)):
+async def create_player(request: Request, name: str = Form(...)):
     try:
         _require_instructor(request)
     except HTTPException:
@@ -412,103 +795,90 @@ def create_player(request: Request, name: str = Form(...)):
     if not name:
         raise HTTPException(status_code=400, detail="Name is required")
 
-    conn = get_db()
-    try:
-        code = _make_login_code(conn)
-        conn.execute(
-            "INSERT INTO players (name, login_code, created_at, updated_at) VALUES (?, ?, datetime('now'), datetime('now'))",
-            (name, code),
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    async with get_db_write() as conn:
+        for _ in range(LOGIN_CODE_ATTEMPTS):
+            code = _make_login_code()
+            try:
+                await conn.execute(
+                    "INSERT INTO players (name, login_code, created_at, updated_at) VALUES (?, ?, datetime('now'), datetime('now'))",
+                    (name, code),
+                )
+                break
+            except sqlite3.IntegrityError:
+                continue  # login_code already taken; try another
+        else:
+            raise RuntimeError("Could not generate unique login code")
+    _invalidate_roster()
+    _login_misses.pop(code, None)
 
     return RedirectResponse("/instructor", status_code=303)
 
 @app.post("/favorite/{player_id}")
-def toggle_favorite(request: Request, player_id: int):
+async def toggle_favorite(request: Request, player_id: int):
     try:
         iid = _require_instructor(request)
     except HTTPException:
-        return JSONResponse({"ok": False, "favorite": False, "favorited": False}, status_code=401)
+        return ORJSONResponse({"ok": False, "favorite": False, "favorited": False}, status_code=401)
 
-    conn = get_db()
-    try:
-        row = conn.execute(
-            "SELECT 1 FROM instructor_favorites WHERE instructor_id=? AND player_id=?",
+    async with _fk_write() as conn:
+        # Try the un-favorite first; only insert if there was nothing to delete.
+        cur = await conn.execute(
+            "DELETE FROM instructor_favorites WHERE instructor_id=? AND player_id=?",
             (iid, player_id),
-        ).fetchone()
-        if row:
-            conn.execute(
-                "DELETE FROM instructor_favorites WHERE instructor_id=? AND player_id=?",
-                (iid, player_id),
-            )
-            conn.commit()
-            return JSONResponse({"ok": True, "favorite": False, "favorited": False})
-        else:
-            conn.execute(
-                "INSERT INTO instructor_favorites (instructor_id, player_id) VALUES (?, ?)",
+        )
+        favorite = cur.rowcount == 0
+        if favorite:
+            await conn.execute(
+                "INSERT OR IGNORE INTO instructor_favorites (instructor_id, player_id) VALUES (?, ?)",
                 (iid, player_id),
             )
-            conn.commit()
-            return JSONResponse({"ok": True, "favorite": True, "favorited": True})
-    finally:
-        conn.close()
+    _invalidate_roster()
+
+    return {"ok": True, "favorite": favorite, "favorited": favorite}
+
+# The drill dropdown is the same for every player and drills only change through
+# schema seeding, so the detail page reuses one copy for DRILLS_CACHE_TTL seconds.
+DRILLS_CACHE_TTL = 60.0
+_drills_cache: Tuple[float, list] = (0.0, [])
+
+async def _drill_options() -> list:
+    global _drills_cache
+    expires, rows = _drills_cache
+    if expires <= time.monotonic():
+        rows = await _read("SELECT id, title FROM drills ORDER BY title")
+        _drills_cache = (time.monotonic() + DRILLS_CACHE_TTL, rows)
+    return rows
 
 @app.get("/instructor/player/{player_id}")
-def instructor_player_detail(request: Request, player_id: int):
+async def instructor_player_detail(request: Request, player_id: int):
     # must be logged in as instructor
     try:
         _require_instructor(request)
     except HTTPException:
         return RedirectResponse("/", status_code=303)
 
-    conn = get_db()
-    try:
-        cur = conn.cursor()
-
+    # The reads are independent; run them concurrently on separate readers.
+    player_rows, metrics_rows, latest_metrics, notes, drills, assignments = await asyncio.gather(
         # --- player ---
-        player_row = cur.execute("SELECT * FROM players WHERE id = ?", (player_id,)).fetchone()
-        if not player_row:
-            raise HTTPException(status_code=404, detail="Player not found")
-        player = dict(player_row)
-        # Provide avatar_url convenience for templates
-        player["avatar_url"] = player.get("avatar_url") or player.get("image_path") or None
-
-        # --- metrics for chart (EV/LA/SR) ---
-        metrics_rows = cur.execute(
+        _read("SELECT * FROM players WHERE id = ?", (player_id,)),
+        # --- metrics for chart (EV/LA/SR), latest 25 days in chronological order ---
+        _read(
             """
-            SELECT
-                COALESCE(date, recorded_at, substr(created_at, 1, 10)) AS date,
-                exit_velocity, launch_angle, spin_rate
-            FROM metrics
-            WHERE player_id = ?
-            ORDER BY COALESCE(date, recorded_at, created_at) DESC, id DESC
-            LIMIT 25
+            SELECT COALESCE(date, ''), COALESCE(exit_velocity, 0.0),
+                   COALESCE(launch_angle, 0.0), COALESCE(spin_rate, 0.0)
+            FROM (
+                SELECT date, exit_velocity, launch_angle, spin_rate
+                FROM v_metrics_daily
+                WHERE player_id = ?
+                ORDER BY date DESC
+                LIMIT 25
+            ) ORDER BY date ASC
             """,
             (player_id,),
-        ).fetchall()
-
-        def _label(v):
-            if isinstance(v, datetime):
-                return v.date().isoformat()
-            if isinstance(v, date):
-                return v.isoformat()
-            if v is None:
-                return ""
-            s = str(v)
-            return s[:10] if len(s) >= 10 and s[4] == "-" and s[7] == "-" else s
-
-        dates, exitv, launch, spin = [], [], [], []
-        for m in reversed(list(metrics_rows)):  # reverse DESC -> chronological
-            d = m["date"]
-            dates.append(_label(d))
-            exitv.append(float(m["exit_velocity"] or 0))
-            launch.append(float(m["launch_angle"] or 0))
-            spin.append(float(m["spin_rate"] or 0))
-
+            tuples=True,
+        ),
         # --- latest generic metrics list (for "Updated Metrics" section) ---
-        latest_metrics = cur.execute(
+        _read(
             """
             SELECT metric, value, unit, source, note,
                    COALESCE(recorded_at, date, created_at) AS recorded_at
@@ -518,27 +888,24 @@ def instructor_player_detail(request: Request, player_id: int):
             LIMIT 25
             """,
             (player_id,),
-        ).fetchall()
-
+        ),
         # --- notes ---
-        notes = cur.execute(
+        _read(
             """
-            SELECT text, shared, kind, created_at
+            SELECT text, kind, created_at
             FROM notes
             WHERE player_id = ?
             ORDER BY created_at DESC, id DESC
             LIMIT 25
             """,
             (player_id,),
-        ).fetchall()
-
+        ),
         # --- drill library (for select dropdown) ---
-        drills = cur.execute("SELECT id, title FROM drills ORDER BY title").fetchall()
-
+        _drill_options(),
         # --- current assignments (read-only list) ---
-        assignments = cur.execute(
+        _read(
             """
-            SELECT a.*,
+            SELECT a.status, a.note, a.due_date, a.created_at,
                    COALESCE(d.title, 'Drill') AS drill_name
             FROM drill_assignments a
             LEFT JOIN drills d ON d.id = a.drill_id
@@ -547,31 +914,39 @@ def instructor_player_detail(request: Request, player_id: int):
             LIMIT 25
             """,
             (player_id,),
-        ).fetchall()
-
-        ctx = {
-            "request": request,
-            "player": player,
-            "metrics": metrics_rows,
-            "latest_metrics": latest_metrics,
-            "notes": notes,
-            "drills": drills,
-            "assignments": assignments,
-            # chart data for template <script> using |tojson
-            "dates": dates,
-            "exitv": exitv,
-            "launch": launch,
-            "spin": spin,
-        }
-        return templates.TemplateResponse("instructor_player_detail.html", ctx)
-    finally:
-        conn.close()
+        ),
+    )
+    if not player_rows:
+        raise HTTPException(status_code=404, detail="Player not found")
+    player = dict(player_rows[0])
+    # Provide avatar_url convenience for templates
+    player["avatar_url"] = player.get("avatar_url") or player.get("image_path") or None
+
+    # SQL already filled the gaps; just transpose rows into per-series lists.
+    dates, exitv, launch, spin = (list(col) for col in zip(*metrics_rows)) if metrics_rows else ([], [], [], [])
+
+    ctx = {
+        "request": request,
+        "player": player,
+        "metrics": metrics_rows,
+        "latest_metrics": latest_metrics,
+        "notes": notes,
+        "drills": drills,
+        "assignments": assignments,
+        # chart data; the <script> block reads the pre-serialized chart_json
+        "dates": dates,
+        "exitv": exitv,
+        "chart_json": _chart_json(dates, exitv),
+        "launch": launch,
+        "spin": spin,
+    }
+    return templates.TemplateResponse("instructor_player_detail.html", ctx)
 
 # -----------------------------------------------------------------------------
 # Metrics & Notes (instructor actions)
 # -----------------------------------------------------------------------------
 @app.post("/metrics/add")
-def add_metrics(
+async def add_metrics(
     request: Request,
     player_id: int = Form(...),
     # New generic style:
@@ -590,35 +965,31 @@ def add_metrics(
     except HTTPException:
         return RedirectResponse("/", status_code=303)
 
-    dval = (date_str or "").strip() or datetime.utcnow().strftime("%Y-%m-%d")
-    conn = get_db()
-    try:
-        if metric and value is not None:
-            # Insert generic metric row
-            conn.execute(
-                """
-                INSERT INTO metrics (player_id, date, metric, value, unit, source, note, entered_by_instructor_id, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, 'manual', ?, ?, datetime('now'), datetime('now'))
-                """,
-                (player_id, dval, metric.strip(), float(value), (unit or "").strip() or None, (note or "").strip() or None, iid),
-            )
-        else:
-            # Back-compat fields (EV/LA/SR)
-            conn.execute(
-                """
-                INSERT INTO metrics (player_id, date, exit_velocity, launch_angle, spin_rate, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, datetime('now'), datetime('now'))
-                """,
-                (player_id, dval, exit_velocity, launch_angle, spin_rate),
-            )
-        conn.commit()
-    finally:
-        conn.close()
+    dval = (date_str or "").strip() or None  # None -> stamped by SQLite below
+    if metric and value is not None:
+        # Generic metric row
+        row = (player_id, dval, metric.strip(), float(value), (unit or "").strip() or None, "manual",
+               (note or "").strip() or None, iid, None, None, None)
+    else:
+        # Back-compat fields (EV/LA/SR)
+        row = (player_id, dval, None, None, None, None, None, None, exit_velocity, launch_angle, spin_rate)
+
+    # One statement shape for both forms keeps a single prepared statement hot.
+    async with _fk_write() as conn:
+        await conn.execute(
+            """
+            INSERT INTO metrics (player_id, date, metric, value, unit, source, note, entered_by_instructor_id,
+                                 exit_velocity, launch_angle, spin_rate, created_at, updated_at)
+            VALUES (?, COALESCE(?, date('now')), ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'), datetime('now'))
+            """,
+            row,
+        )
+    _invalidate_dashboard(player_id)
 
     return RedirectResponse(f"/instructor/player/{player_id}", status_code=303)
 
 @app.post("/notes/add")
-def add_note(
+async def add_note(
     request: Request,
     player_id: int = Form(...),
     text: str = Form(...),
@@ -636,89 +1007,118 @@ def add_note(
 
     shared = 1 if share_with_player else 0
 
-    conn = get_db()
-    try:
-        conn.execute(
+    async with _fk_write() as conn:
+        await conn.execute(
             """
             INSERT INTO notes (player_id, instructor_id, text, shared, kind, created_at, updated_at)
             VALUES (?, ?, ?, ?, 'coach', datetime('now'), datetime('now'))
             """,
             (player_id, iid, text, shared),
         )
-        conn.commit()
         # TODO: if text_player, trigger SMS integration here.
-    finally:
-        conn.close()
+    _invalidate_dashboard(player_id)
 
     return RedirectResponse(f"/instructor/player/{player_id}", status_code=303)
 
 # -----------------------------------------------------------------------------
 # Player dashboard
 # -----------------------------------------------------------------------------
-def _years_old(dob_str: str | None) -> Optional[int]:
-    if not dob_str:
-        return None
+def _parse_dob(dob_str: str) -> Optional[date]:
+    # ISO dates parse in C; fall back to strptime for the other accepted formats.
+    try:
+        return date.fromisoformat(dob_str)
+    except ValueError:
+        pass
     for fmt in ("%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y"):
         try:
-            d = datetime.strptime(dob_str, fmt).date()
-            today = date.today()
-            return today.year - d.year - ((today.month, today.day) < (d.month, d.day))
+            return datetime.strptime(dob_str, fmt).date()
         except ValueError:
             continue
     return None
 
+def _years_old(dob_str: str | None) -> Optional[int]:
+    if not dob_str:
+        return None
+    d = _parse_dob(dob_str)
+    if d is None:
+        return None
+    today = date.today()
+    return today.year - d.year - ((today.month, today.day) < (d.month, d.day))
+
+# Per-player cache of the dashboard context. A write for a player records when
+# it happened so any entry loaded before it is ignored; the TTL bounds
+# staleness across workers. Both maps drop anything older than the TTL, since
+# an entry that old is expired whatever writes it missed.
+DASHBOARD_CACHE_TTL = 10.0
+_dashboard_writes: Dict[int, float] = {}
+_dashboard_cache: Dict[int, Tuple[float, dict]] = {}
+
+def _prune_dashboard(cutoff: float):
+    for pid in [k for k, written_at in _dashboard_writes.items() if written_at <= cutoff]:
+        del _dashboard_writes[pid]
+    for pid in [k for k, entry in _dashboard_cache.items() if entry[0] <= cutoff]:
+        del _dashboard_cache[pid]
+
+def _invalidate_dashboard(player_id: int):
+    now = time.monotonic()
+    _prune_dashboard(now - DASHBOARD_CACHE_TTL)
+    _dashboard_writes[player_id] = now
+
 @app.get("/dashboard")
-def dashboard(request: Request):
+async def dashboard(request: Request):
     pid = request.session.get("player_id")
     if not pid:
         return RedirectResponse("/", status_code=303)
 
-    conn = get_db()
-    try:
-        row = conn.execute("SELECT * FROM players WHERE id = ?", (pid,)).fetchone()
-        if not row:
+    hit = _dashboard_cache.get(pid)
+    if (
+        hit
+        and hit[0] > time.monotonic() - DASHBOARD_CACHE_TTL
+        and hit[0] > _dashboard_writes.get(pid, float("-inf"))
+    ):
+        data = hit[1]
+    else:
+        loaded_at = time.monotonic()  # a write landing mid-load leaves this entry stale
+        data = await _load_dashboard(pid)
+        _prune_dashboard(time.monotonic() - DASHBOARD_CACHE_TTL)
+        if data is None:
+            _dashboard_cache.pop(pid, None)
             return RedirectResponse("/", status_code=303)
+        _dashboard_cache[pid] = (loaded_at, data)
 
-        player = dict(row)
-        player["avatar_url"] = player.get("avatar_url") or player.get("image_path") or None
-        login_code = player.get("login_code") or ""
-
-        # Age from whichever DOB column exists
-        dob_str = player.get("birthdate") or player.get("dob") or player.get("date_of_birth")
-        age_years = _years_old(dob_str)
+    return templates.TemplateResponse("dashboard.html", {"request": request, **data})
 
+async def _load_dashboard(pid: int) -> Optional[dict]:
+    # The four reads are independent; run them concurrently on separate readers.
+    prows, mrows, nrows, arows = await asyncio.gather(
+        _read("SELECT * FROM players WHERE id = ?", (pid,)),
         # Chart data (safe)
-        mrows = conn.execute(
+        _read(
             """
-            SELECT COALESCE(date, recorded_at, substr(created_at,1,10)) AS d,
-                   exit_velocity
-            FROM metrics
+            SELECT date, exit_velocity
+            FROM v_metrics_daily
             WHERE player_id = ? AND exit_velocity IS NOT NULL
-            ORDER BY COALESCE(date, recorded_at, created_at) ASC, id ASC
+            ORDER BY date ASC
             LIMIT 90
             """,
             (pid,),
-        ).fetchall()
-        dates = [r["d"] for r in (mrows or [])]
-        exitv  = [float(r["exit_velocity"]) for r in (mrows or [])]
-
-        # Notes: pick shared ones
-        nrows = conn.execute(
+            tuples=True,
+        ),
+        # Notes: only the ones shared with the player
+        _read(
             """
-            SELECT text, shared, kind, created_at
+            SELECT text, kind, created_at
             FROM notes
-            WHERE player_id = ?
+            WHERE player_id = ? AND shared = 1
             ORDER BY created_at DESC, id DESC
             LIMIT 100
             """,
             (pid,),
-        ).fetchall()
-        notes = [dict(r) for r in (nrows or []) if bool(r["shared"])]
-
+        ),
         # Assignments (read-only)
-        arows = conn.execute(
+        _read(
             """
-            SELECT a.*,
+            SELECT a.status, a.note, a.due_date, a.created_at,
                    COALESCE(d.title, 'Drill') AS drill_name
             FROM drill_assignments a
             LEFT JOIN drills d ON d.id = a.drill_id
@@ -727,19 +1127,30 @@ def dashboard(request: Request):
             LIMIT 25
             """,
             (pid,),
-        ).fetchall()
-        assignments = [dict(r) for r in (arows or [])]
-
-        ctx = {
-            "request": request,
-            "player": player,          # dict works with dot-access in Jinja
-            "age_years": age_years,
-            "login_code": login_code,
-            "dates": dates,
-            "exitv": exitv,
-            "notes": notes,
-            "assignments": assignments,
-        }
-        return templates.TemplateResponse("dashboard.html", ctx)
-    finally:
-        conn.close()
+        ),
+    )
+    if not prows:
+        return None
+
+    player = dict(prows[0])
+    player["avatar_url"] = player.get("avatar_url") or player.get("image_path") or None
+    login_code = player.get("login_code") or ""
+
+    # Age from whichever DOB column exists
+    dob_str = player.get("birthdate") or player.get("dob") or player.get("date_of_birth")
+    age_years = _years_old(dob_str)
+
+    dates, exitv = (list(col) for col in zip(*mrows)) if mrows else ([], [])
+    notes = [dict(r) for r in (nrows or [])]
+    assignments = [dict(r) for r in (arows or [])]
+
+    return {
+        "player": player,          # dict works with dot-access in Jinja
+        "age_years": age_years,
+        "login_code": login_code,
+        "dates": dates,
+        "exitv": exitv,
+        "chart_json": _chart_json(dates, exitv),
+        "notes": notes,
+        "assignments": assignments,
+    }
@@ -5,7 +5,9 @@
   const applyTheme = (t) => {
     document.documentElement.setAttribute('data-theme', t);
     if (logo) {
-      logo.src = t === 'light' ? '/static/logos/Hit4PowerMainLogoLight.png' : '/static/logos/Hit4PowerMainLogoDark.png';
+      // versioned URLs rendered by the template; only swap when it actually changes
+      const src = t === 'light' ? logo.dataset.lightSrc : logo.dataset.darkSrc;
+      if (src && logo.getAttribute('src') !== src) logo.src = src;
     }
   };
   let saved = localStorage.getItem('theme') || 'dark';
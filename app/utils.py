@@ -1,9 +1,9 @@
+import base64
 import os
 import re
 import hmac
 import hashlib
-import random
-import string
+from functools import lru_cache
 from typing import Optional
 
 # -------- Flash helpers (session-based) --------
@@ -18,6 +18,11 @@ def pop_flash(request):
 
 # -------- Code generation & normalization --------
 
+_NON_CODE_CHARS = re.compile(r"[^A-Z0-9]")
+# Same filter for pure-ASCII input as one bytes.translate deletion pass (no regex engine).
+_ASCII_NON_CODE = bytes(c for c in range(128) if not (0x41 <= c <= 0x5A or 0x30 <= c <= 0x39))
+
+
 def normalize_code(s: str) -> str:
     """
     Uppercase and strip non-alphanumerics so lookups are consistent.
@@ -25,7 +30,10 @@ def normalize_code(s: str) -> str:
     """
     if s is None:
         return ""
-    return re.sub(r"[^A-Z0-9]", "", s.strip().upper())
+    s = s.strip().upper()
+    if s.isascii():
+        return s.encode("ascii").translate(None, _ASCII_NON_CODE).decode("ascii")
+    return _NON_CODE_CHARS.sub("", s)
 
 
 def generate_code(prefix: str = "", length: int = 6, pretty: bool = True) -> str:
@@ -33,7 +41,8 @@ def generate_code(prefix: str = "", length: int = 6, pretty: bool = True) -> str
     Generate a random alphanumeric code, optionally with a prefix.
     If pretty=True and prefix is a single letter, add a hyphen like 'P-XXXXXX'.
     """
-    core = "".join(random.choices(string.ascii_uppercase + string.digits, k=length))
+    # Base32 of OS randomness: uppercase A-Z and 2-7, without a per-character loop.
+    core = base64.b32encode(os.urandom((length * 5 + 7) // 8)).decode("ascii")[:length]
     if pretty and prefix and len(prefix) == 1:
         return f"{prefix}-{core}"
     return f"{prefix}{core}"
@@ -46,14 +55,21 @@ def _secret_salt() -> bytes:
     return os.getenv("CODE_HASH_SALT", "hit4power-default-salt").encode("utf-8")
 
 
+@lru_cache(maxsize=4)
+def _hmac_template(salt: bytes) -> "hmac.HMAC":
+    # Keyed once per salt; hash_code copies it instead of re-deriving the key pads.
+    return hmac.new(salt, digestmod=hashlib.sha256)
+
+
 def hash_code(raw_code: str) -> str:
     """
     Hash a code with HMAC-SHA256.
     Store this in the DB instead of the raw code if you want to avoid plaintext.
     """
     norm = normalize_code(raw_code)
-    digest = hmac.new(_secret_salt(), norm.encode("utf-8"), hashlib.sha256).hexdigest()
-    return digest
+    h = _hmac_template(_secret_salt()).copy()
+    h.update(norm.encode("utf-8"))
+    return h.hexdigest()
 
 
 def verify_code(stored_hash: str, provided_code: str) -> bool: